@@ -0,0 +1,293 @@
+import os
+import struct
+import time
+import numpy as np
+
+# --- CONFIGURATION ---
+ACCOUNT_IDS_DIR = "data/account_ids"
+NAME_WIDTH = 16            # PaySim names are 11 chars (e.g. C1231006815)
+MAX_LOAD_FACTOR = 0.5
+
+# names.bin: 64-byte header + fixed-width names, indexed by ID
+# index.bin: 64-byte header + open-addressing table of (ID + 1), 0 = empty
+HEADER_SIZE = 64
+NAMES_HEADER = "<8sHHIQ"    # magic, version, id itemsize, name width, committed count
+INDEX_HEADER = "<8sHHIQ"    # magic, version, id itemsize, reserved, capacity
+NAMES_MAGIC = b"SNTLACCT"
+INDEX_MAGIC = b"SNTLAIDX"
+LAYOUT_VERSION = 1
+
+_M1 = np.uint64(0x9E3779B97F4A7C15)
+_M2 = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def _hash(keys):
+    """Vectorised 64-bit hash of fixed-width byte strings (viewed as uint64 words)."""
+    words = keys.view('<u8').reshape(len(keys), keys.dtype.itemsize // 8)
+    h = np.zeros(len(keys), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for i in range(words.shape[1]):
+            h = (h ^ words[:, i]) * _M1
+            h ^= h >> np.uint64(29)
+        h *= _M2
+        h ^= h >> np.uint64(32)
+    return h
+
+
+class AccountIds:
+    """
+    Persistent Account-ID Interning.
+    Maps account names to dense integer IDs (in order of first appearance) using a
+    memory-mapped name table and hash index, so the graph, GNN and feature store all
+    agree on IDs across runs. One process may write; any number may map it read-only.
+    """
+    def __init__(self, directory=ACCOUNT_IDS_DIR, readonly=False, id_dtype=np.int32):
+        self.directory = directory
+        self.readonly = readonly
+        self._names_path = os.path.join(directory, "names.bin")
+        self._index_path = os.path.join(directory, "index.bin")
+
+        if not os.path.exists(self._names_path):
+            if readonly:
+                raise FileNotFoundError(f"No account ID registry at {directory}")
+            os.makedirs(directory, exist_ok=True)
+            self._create(np.dtype(id_dtype))
+        self._open()
+
+    # --- Storage ---
+
+    def _create(self, id_dtype):
+        self.id_dtype = id_dtype
+        self.name_dtype = np.dtype(f"S{NAME_WIDTH}")
+        self._write_names_file(self._names_path, capacity=1 << 16, count=0)
+        self._write_index_file(self._index_path, np.zeros(1 << 17, dtype=id_dtype))
+
+    def _write_names_file(self, path, capacity, count, names=None):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack(NAMES_HEADER, NAMES_MAGIC, LAYOUT_VERSION, self.id_dtype.itemsize,
+                                self.name_dtype.itemsize, count).ljust(HEADER_SIZE, b"\0"))
+            if names is not None:
+                f.write(names.tobytes())
+            f.truncate(HEADER_SIZE + capacity * self.name_dtype.itemsize)
+        os.replace(tmp, path)
+
+    def _write_index_file(self, path, table):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack(INDEX_HEADER, INDEX_MAGIC, LAYOUT_VERSION, self.id_dtype.itemsize,
+                                0, len(table)).ljust(HEADER_SIZE, b"\0"))
+            f.write(table.tobytes())
+        os.replace(tmp, path)  # Atomic: readers keep their old mapping until refresh()
+
+    def _open(self):
+        mode = 'r' if self.readonly else 'r+'
+        raw = np.memmap(self._names_path, dtype=np.uint8, mode=mode)
+        magic, version, id_size, width, count = struct.unpack_from(NAMES_HEADER, raw, 0)
+        if magic != NAMES_MAGIC or version != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported account ID registry at {self.directory}")
+        self.id_dtype = np.dtype(f"<i{id_size}")
+        self.name_dtype = np.dtype(f"S{width}")
+        self._names_raw = raw
+        self._names = raw[HEADER_SIZE:].view(self.name_dtype)
+        self._count = count
+
+        index_raw = np.memmap(self._index_path, dtype=np.uint8, mode=mode)
+        magic, version, _, _, capacity = struct.unpack_from(INDEX_HEADER, index_raw, 0)
+        if magic != INDEX_MAGIC or version != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported account ID index at {self.directory}")
+        self._index_raw = index_raw
+        self._table = index_raw[HEADER_SIZE:].view(self.id_dtype)
+        self._inodes = self._current_inodes()
+
+    def _current_inodes(self):
+        return os.stat(self._names_path).st_ino, os.stat(self._index_path).st_ino
+
+    def refresh(self):
+        """Readers: pick up IDs committed by the writer since the mapping was opened."""
+        if self._current_inodes() != self._inodes:
+            self._open()  # The writer grew a file and swapped it in
+        else:
+            self._count = struct.unpack_from(NAMES_HEADER, self._names_raw, 0)[4]
+
+    def flush(self):
+        """Publishes new IDs: data pages first, then the committed count."""
+        if self.readonly:
+            return
+        self._names_raw.flush()
+        self._index_raw.flush()
+        self._names_raw[:HEADER_SIZE] = np.frombuffer(
+            struct.pack(NAMES_HEADER, NAMES_MAGIC, LAYOUT_VERSION, self.id_dtype.itemsize,
+                        self.name_dtype.itemsize, self._count).ljust(HEADER_SIZE, b"\0"), dtype=np.uint8)
+        self._names_raw.flush()
+
+    def close(self):
+        self.flush()
+        self._names = self._table = None
+        self._names_raw = self._index_raw = None
+
+    def _reserve(self, extra):
+        """
+        Grows the name table and/or rebuilds the index so `extra` more IDs fit.
+        IDs issued since the last flush() are kept: _open() would reset the count to the
+        published one in the names header.
+        """
+        count = self._count
+        needed = count + extra
+        if needed > len(self._names):
+            capacity = max(needed, 2 * len(self._names))
+            names = np.array(self._names[:count])
+            self._names = self._names_raw = None
+            self._write_names_file(self._names_path, capacity, count, names)
+            self._open()
+            self._count = count
+        if needed > MAX_LOAD_FACTOR * len(self._table):
+            capacity = len(self._table)
+            while needed > MAX_LOAD_FACTOR * capacity:
+                capacity *= 2
+            table = np.zeros(capacity, dtype=self.id_dtype)
+            ids = np.arange(count, dtype=self.id_dtype)
+            self._insert(table, self._names[:count], ids)
+            self._table = self._index_raw = None
+            self._write_index_file(self._index_path, table)
+            self._open()
+            self._count = count
+
+    # --- Hash table ---
+
+    @staticmethod
+    def _insert(table, keys, ids):
+        """Vectorised linear-probing insert of keys known to be absent and unique."""
+        mask = np.uint64(len(table) - 1)
+        slots = _hash(keys) & mask
+        pending = np.arange(len(keys))
+        while pending.size:
+            s = slots[pending]
+            free = table[s] == 0
+            # Several keys may race for the same free slot: the first one wins this round
+            _, first = np.unique(s[free], return_index=True)
+            winners = pending[free][first]
+            table[slots[winners]] = ids[winners] + 1
+            placed = np.zeros(len(keys), dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+    def _lookup(self, keys):
+        """Vectorised probe; returns IDs with -1 for unknown names."""
+        table, names, count = self._table, self._names, self._count
+        mask = np.uint64(len(table) - 1)
+        slots = _hash(keys) & mask
+        result = np.full(len(keys), -1, dtype=self.id_dtype)
+        pending = np.arange(len(keys))
+        while pending.size:
+            s = slots[pending]
+            cand = table[s].astype(np.int64) - 1
+            empty = cand < 0
+            committed = ~empty & (cand < count)
+            match = np.zeros(len(pending), dtype=bool)
+            match[committed] = names[cand[committed]] == keys[pending[committed]]
+            result[pending[match]] = cand[match]
+            keep = ~empty & ~match
+            pending = pending[keep]
+            slots[pending] = (s[keep] + np.uint64(1)) & mask
+        return result
+
+    def _as_keys(self, names):
+        arr = np.asarray(names)
+        if arr.dtype == object:
+            arr = arr.astype(str)
+        width = self.name_dtype.itemsize
+        chars = arr.dtype.itemsize // 4 if arr.dtype.kind == 'U' else arr.dtype.itemsize
+        if arr.dtype.kind in 'US' and arr.size and chars > width:
+            if np.char.str_len(arr).max() > width:
+                raise ValueError(f"Account names longer than {width} chars")
+        return np.ascontiguousarray(arr.astype(self.name_dtype).ravel())
+
+    # --- Public API ---
+
+    def __len__(self):
+        return self._count
+
+    def encode(self, names, add=True):
+        """
+        Bulk-encodes names (list, ndarray or pandas Series) to IDs. New names get the next
+        IDs in order of first appearance; with add=False they map to -1.
+        """
+        keys = self._as_keys(names)
+        ids = self._lookup(keys)
+        missing = ids < 0
+        if add and missing.any():
+            if self.readonly:
+                raise PermissionError("Account ID registry is open read-only")
+            new_keys, first, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+            order = np.argsort(first)                   # Arrival order
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            new_ids = (self._count + rank).astype(self.id_dtype)
+
+            self._reserve(len(new_keys))
+            self._names[new_ids] = new_keys
+            self._insert(self._table, new_keys, new_ids)
+            self._count += len(new_keys)
+            ids[missing] = new_ids[inverse.ravel()]
+        return ids
+
+    def decode(self, ids, as_str=True):
+        """Bulk-decodes IDs back to names (str array, or raw bytes with as_str=False)."""
+        ids = np.asarray(ids)
+        if ids.size and (ids.min() < 0 or ids.max() >= self._count):
+            raise KeyError("Unknown account ID")
+        names = self._names[ids]
+        return np.char.decode(names, 'ascii') if as_str else names
+
+    def id_of(self, name):
+        found = self._lookup(self._as_keys([name]))[0]
+        return int(found) if found >= 0 else None
+
+    def name_of(self, account_id):
+        return self.decode([account_id])[0]
+
+    def encode_frame(self, df, columns=('nameOrig', 'nameDest')):
+        """Returns `df` with its account-name columns replaced by IDs."""
+        encoded = {col: self.encode(df[col].to_numpy()) for col in columns}
+        self.flush()
+        return df.assign(**encoded)
+
+
+def _synthetic_names(n, distinct, seed=7):
+    rng = np.random.default_rng(seed)
+    return np.char.add("C", rng.integers(10**9, 10**9 + distinct, size=n).astype(str))
+
+
+if __name__ == "__main__":
+    # Benchmark: memory and encode throughput vs Python strings and sklearn's LabelEncoder
+    import tempfile
+    import pandas as pd
+    N, DISTINCT = 2_000_000, 1_500_000
+    names = pd.Series(_synthetic_names(N, DISTINCT)).astype(object)
+    print(f"📇 {N} account names ({names.nunique()} distinct)")
+    print(f"   object column: {names.memory_usage(deep=True) / 2**20:7.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = AccountIds(tmp)
+        start = time.time()
+        ids = registry.encode(names.to_numpy())
+        registry.flush()
+        cold = time.time() - start
+        start = time.time()
+        registry.encode(names.to_numpy(), add=False)
+        warm = time.time() - start
+        print(f"   int32 column:  {ids.nbytes / 2**20:7.1f} MB "
+              f"(+ registry {(os.path.getsize(registry._names_path) + os.path.getsize(registry._index_path)) / 2**20:.1f} MB on disk, shared)")
+        print(f"⚡ AccountIds encode (new accounts): {N / cold:>12,.0f} names/s")
+        print(f"⚡ AccountIds encode (known):        {N / warm:>12,.0f} names/s")
+        assert (registry.decode(ids[:1000]) == names.to_numpy()[:1000]).all()
+
+    try:
+        from sklearn.preprocessing import LabelEncoder
+        start = time.time()
+        LabelEncoder().fit(names).transform(names)
+        print(f"🐢 LabelEncoder fit+transform:       {N / (time.time() - start):>12,.0f} names/s")
+    except ImportError:
+        print("⚠️  scikit-learn not installed; skipping LabelEncoder comparison")
@@ -7,9 +7,11 @@ import sys
 DATA_DIR = "data"
 DEFAULT_FILE = "PS_20174392719_1491204439457_log.csv"
 
-def load_paysim_data():
+def load_paysim_data(intern_ids=False):
     """
     Loads the PaySim dataset from the data directory.
+    With intern_ids=True, nameOrig/nameDest are replaced by persistent integer account IDs
+    (see data_pipeline/account_ids.py).
     """
     # Find any CSV in data dir if default doesn't exist
     target_file = os.path.join(DATA_DIR, DEFAULT_FILE)
@@ -34,6 +36,12 @@ def load_paysim_data():
     # Filter
     df = df.loc[(df['type'].isin(['TRANSFER', 'CASH_OUT']))]
     
+    if intern_ids:
+        from data_pipeline.account_ids import AccountIds
+        registry = AccountIds()
+        df = registry.encode_frame(df)
+        print(f"🔢 Interned account IDs ({len(registry)} accounts in registry)")
+
     print(f"✅ Loaded {len(df)} relevant transactions.")
     return df
 
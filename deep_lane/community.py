@@ -0,0 +1,302 @@
+import math
+import random
+import time
+from collections import defaultdict
+
+# Community scoring
+MIN_RING_SIZE = 3
+MAX_RING_SIZE = 500       # Larger communities are merchant / cash-out hubs, not rings
+FLOW_SCALE = 1e7          # NPR of internal flow that saturates the flow term
+FRAUD_WEIGHT = 0.6
+SHAPE_WEIGHT = 0.25
+FLOW_WEIGHT = 0.15
+LPA_MAX_SWEEPS = 10
+# Periodic pass cadence for maybe_refresh(): whichever comes first
+REFRESH_EVERY_EDGES = 50_000
+REFRESH_INTERVAL_S = 30.0
+
+
+class UnionFind:
+    """
+    Incremental Weakly Connected Components.
+    Union by size with path halving; amortised ~O(1) per edge.
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, x):
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size.pop(rb)
+        return ra
+
+
+class CommunityEngine:
+    """
+    Incremental Mule-Ring Detection.
+    Components are maintained with union-find as edges stream in. refresh() then runs a
+    label-propagation pass seeded with the previous labels, starting only from accounts
+    touched since the last pass, so work stays inside the components that changed.
+    maybe_refresh() runs that pass on a cadence (every `refresh_every` edges or
+    `refresh_interval_s` seconds) for streaming callers.
+    """
+    def __init__(self, seed=42, refresh_every=REFRESH_EVERY_EDGES, refresh_interval_s=REFRESH_INTERVAL_S):
+        self.components = UnionFind()
+        self.out_edges = defaultdict(dict)   # src -> {dst: [amount, count, fraud_count]}
+        self.neighbours = defaultdict(dict)  # undirected txn counts, used by label propagation
+
+        self.label_of = {}                   # account -> community id
+        self.members = defaultdict(set)      # community id -> accounts
+        self.score_of = {}                   # community id -> risk score
+
+        self.refresh_every = refresh_every
+        self.refresh_interval_s = refresh_interval_s
+        self._touched = set()
+        self._pending_edges = 0
+        self._last_refresh = time.time()
+        self._rng = random.Random(seed)
+
+    # --- Streaming updates ---
+
+    def add_edges(self, edges):
+        """
+        Adds (sender, receiver, amount[, is_fraud]) edges. O(1) amortised per edge.
+        """
+        uf, out_edges, neighbours, touched = self.components, self.out_edges, self.neighbours, self._touched
+        for edge in edges:
+            src, dst, amount = edge[0], edge[1], edge[2]
+            fraud = edge[3] if len(edge) > 3 else 0
+            uf.add(src)
+            uf.add(dst)
+            uf.union(src, dst)
+
+            agg = out_edges[src].get(dst)
+            if agg is None:
+                out_edges[src][dst] = [amount, 1, fraud]
+            else:
+                agg[0] += amount
+                agg[1] += 1
+                agg[2] += fraud
+            neighbours[src][dst] = neighbours[src].get(dst, 0) + 1
+            neighbours[dst][src] = neighbours[dst].get(src, 0) + 1
+
+            for node in (src, dst):
+                if node not in self.label_of:
+                    self.label_of[node] = node
+                    self.members[node].add(node)
+            touched.add(src)
+            touched.add(dst)
+            self._pending_edges += 1
+
+    def load_dataframe(self, df):
+        """Streams a PaySim frame (nameOrig -> nameDest, amount, isFraud)."""
+        cols = ['nameOrig', 'nameDest', 'amount'] + (['isFraud'] if 'isFraud' in df.columns else [])
+        self.add_edges(df[cols].itertuples(index=False, name=None))
+
+    def load_state(self, edges, labels=None, scores=None):
+        """
+        Bulk-loads aggregated (sender, receiver, amount, count, fraud_count) edges, e.g. from a
+        deep-lane snapshot. With `labels` ({account: community id}) and `scores`
+        ({community id: score}) the previous communities are restored as-is; otherwise every
+        account starts in its own community and is queued for the next refresh().
+        """
+        uf, out_edges, neighbours = self.components, self.out_edges, self.neighbours
+        for src, dst, amount, count, fraud in edges:
+            uf.add(src)
+            uf.add(dst)
+            uf.union(src, dst)
+            out_edges[src][dst] = [amount, count, fraud]
+            neighbours[src][dst] = neighbours[src].get(dst, 0) + count
+            neighbours[dst][src] = neighbours[dst].get(src, 0) + count
+            if labels is None:
+                self._pending_edges += 1
+
+        for node in uf.parent:
+            label = labels.get(node, node) if labels is not None else node
+            self.label_of[node] = label
+            self.members[label].add(node)
+        if labels is None:
+            self._touched.update(uf.parent)
+        if scores is not None:
+            self.score_of.update((label, score) for label, score in scores.items() if label in self.members)
+
+    # --- Periodic pass ---
+
+    def refresh(self, full=False):
+        """
+        Label propagation over the changed accounts (or every account when `full`), then
+        re-scores the communities whose membership or edges changed.
+        Returns the number of communities re-scored.
+        """
+        active = set(self.label_of) if full else self._touched
+        self._touched = set()
+        self._pending_edges = 0
+        self._last_refresh = time.time()
+        dirty = {self.label_of[n] for n in active}
+
+        queue = list(active)
+        for _ in range(LPA_MAX_SWEEPS):
+            if not queue:
+                break
+            self._rng.shuffle(queue)
+            changed = set()
+            for node in queue:
+                new_label = self._best_label(node)
+                old_label = self.label_of[node]
+                if new_label != old_label:
+                    self.members[old_label].discard(node)
+                    if not self.members[old_label]:
+                        del self.members[old_label]
+                        self.score_of.pop(old_label, None)
+                    self.members[new_label].add(node)
+                    self.label_of[node] = new_label
+                    dirty.add(old_label)
+                    dirty.add(new_label)
+                    changed.update(self.neighbours[node])
+            queue = list(changed)
+
+        rescored = 0
+        for label in dirty:
+            if label in self.members:
+                self.score_of[label] = self._score(label)
+                rescored += 1
+        return rescored
+
+    def maybe_refresh(self):
+        """
+        Runs refresh() if `refresh_every` edges or `refresh_interval_s` seconds have
+        accumulated since the last pass. Returns the number of communities re-scored.
+        """
+        if not self._touched:
+            return 0
+        if self._pending_edges >= self.refresh_every or \
+                time.time() - self._last_refresh >= self.refresh_interval_s:
+            return self.refresh()
+        return 0
+
+    def _best_label(self, node):
+        weights = defaultdict(int)
+        label_of = self.label_of
+        for other, count in self.neighbours[node].items():
+            weights[label_of[other]] += count
+        if not weights:
+            return label_of[node]
+        best = max(weights.values())
+        current = label_of[node]
+        if weights.get(current) == best:
+            return current  # Keep the current label on ties for stability
+        return min(label for label, w in weights.items() if w == best)
+
+    def _score(self, label):
+        """
+        Ring score in [0, 1] from fraud density, hub shape (fan-in + fan-out) and internal flow.
+        """
+        members = self.members[label]
+        size = len(members)
+        if size < MIN_RING_SIZE or size > MAX_RING_SIZE:
+            return 0.0
+
+        txns = fraud = 0
+        flow = 0.0
+        internal_in, internal_out = defaultdict(int), defaultdict(int)
+        for src in members:
+            for dst, (amount, count, fraud_count) in self.out_edges.get(src, {}).items():
+                if dst in members:
+                    txns += count
+                    fraud += fraud_count
+                    flow += amount
+                    internal_out[src] += 1
+                    internal_in[dst] += 1
+
+        fraud_density = fraud / txns if txns else 0.0
+        # Mule shape: a pass-through hub that both collects (fan-in) and disperses (fan-out).
+        # Plain merchants and payroll stars only do one of the two.
+        pass_through = max((min(internal_in[n], internal_out[n]) for n in internal_out), default=0)
+        shape = min(1.0, pass_through / ((size - 1) / 2))
+        flow_term = min(1.0, math.log10(1 + flow) / math.log10(FLOW_SCALE))
+        return FRAUD_WEIGHT * fraud_density + SHAPE_WEIGHT * shape + FLOW_WEIGHT * flow_term
+
+    # --- O(1) queries ---
+
+    def community_of(self, account_id):
+        return self.label_of.get(account_id)
+
+    def risk(self, account_id):
+        """Community risk score for an account (0.0 if unknown or not in a ring)."""
+        label = self.label_of.get(account_id)
+        return self.score_of.get(label, 0.0) if label is not None else 0.0
+
+    def component_size(self, account_id):
+        if account_id not in self.components.parent:
+            return 0
+        return self.components.size[self.components.find(account_id)]
+
+    def top_communities(self, k=5):
+        ranked = sorted(self.score_of.items(), key=lambda x: x[1], reverse=True)[:k]
+        return [(label, score, len(self.members[label])) for label, score in ranked]
+
+
+def _paysim_like_edges(num_txns, seed=7):
+    """
+    PaySim-shaped synthetic stream: near-unique senders, a heavy-tailed set of receivers,
+    and a few planted mule rings (fan-in to a hub that fans back out).
+    """
+    rng = random.Random(seed)
+    num_dest = num_txns // 3
+    edges = []
+    for i in range(num_txns):
+        dst = f"C{int(rng.paretovariate(1.2)) % num_dest}"
+        edges.append((f"O{i}", dst, rng.expovariate(1 / 5000), 0))
+    for ring in range(num_txns // 10000):
+        hub = f"MULE{ring}"
+        smurfs = [f"SMURF{ring}_{j}" for j in range(8)]
+        edges += [(s, hub, 9000.0, 1) for s in smurfs]
+        edges += [(hub, s, 8000.0, 1) for s in smurfs[:3]]
+    rng.shuffle(edges)
+    return edges
+
+
+if __name__ == "__main__":
+    # Benchmark: streaming update cost, incremental refresh and full pass on a PaySim-scale stream
+    import sys
+    NUM_TXNS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_700_000
+    BATCH = 100_000  # ~TRANSFER + CASH_OUT rows in PaySim
+    edges = _paysim_like_edges(NUM_TXNS)
+    engine = CommunityEngine()
+
+    update_s = refresh_s = 0.0
+    for start in range(0, len(edges), BATCH):
+        t0 = time.time()
+        engine.add_edges(edges[start:start + BATCH])
+        t1 = time.time()
+        engine.refresh()
+        update_s += t1 - t0
+        refresh_s += time.time() - t1
+    print(f"➕ Union-find updates: {len(edges) / update_s:,.0f} edges/s "
+          f"({update_s / len(edges) * 1e6:.2f} µs/edge)")
+    print(f"🔁 Incremental refresh: {refresh_s / (len(edges) / BATCH):.2f}s per {BATCH} edge batch")
+
+    t0 = time.time()
+    engine.refresh(full=True)
+    print(f"🧮 Full pass over {len(engine.label_of)} accounts: {time.time() - t0:.2f}s")
+
+    print("🚨 TOP 5 SUSPICIOUS MULE RINGS:")
+    for i, (label, score, size) in enumerate(engine.top_communities()):
+        print(f"   {i+1}. Community {label} (Members: {size}, Score: {score:.3f})")
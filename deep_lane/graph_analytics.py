@@ -1,40 +1,102 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
 import sys
 import os
+import time
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from data_pipeline.loader import load_paysim_data
+from data_pipeline.account_ids import AccountIds
+from deep_lane.community import CommunityEngine
+from deep_lane import snapshot
+
+def _encode_names(nodes):
+    """Account names as fixed-width UTF-8 bytes, sized to the longest name so none is truncated."""
+    encoded = [str(node).encode('utf-8') for node in nodes]
+    return np.array(encoded, dtype=f"S{max(map(len, encoded), default=1)}")
 
 class GraphIntel:
-    def __init__(self):
+    def __init__(self, intern_ids=False, window=50000, snapshot_dir=None, snapshot_every=0):
         self.G = None
+        self.communities = None
+        self.pagerank = None
+        # With intern_ids, graph nodes are int account IDs (data_pipeline/account_ids.py)
+        self.intern_ids = intern_ids
+        self.account_ids = None
+        # Window cursor: transactions applied so far (+ newest journal timestamp seen)
+        self.window = window
+        self.cursor = 0
+        self.cursor_ts = 0.0
+        # Journal replay position: {journal: (segment seq, records consumed)}, see DecisionReader
+        self.journal_pos = {}
+        # Periodic snapshots (deep_lane/snapshot.py); 0 disables
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_every = snapshot_every
+        self._snapshot_cursor = 0
         print("🕸️  Initializing Graph Intelligence Engine...")
 
     def build_graph(self):
         """
         Loads PaySim data and builds a Directed Graph.
         Nodes: Users (nameOrig, nameDest)
-        Edges: Transactions (with amount as weight)
+        Edges: Account pairs (amount = total sent, count = txns, isFraud = fraud txns)
         """
         print("⏳ Loading Data for Graph Construction...")
-        df = load_paysim_data()
+        df = load_paysim_data(intern_ids=self.intern_ids)
+        if self.intern_ids:
+            self.account_ids = AccountIds(readonly=True)
         
         # Take a sample to keep it fast for Demo (e.g., first 50k txns)
         # In prod, this would be a time-window sliding graph
-        df_sample = df.head(50000)
+        df_sample = df.head(self.window)
         
         print(f"🏗️  Building Graph from {len(df_sample)} transactions...")
-        self.G = nx.from_pandas_edgelist(
-            df_sample, 
-            source='nameOrig', 
-            target='nameDest', 
-            edge_attr='amount', 
-            create_using=nx.DiGraph()
-        )
+        self.G = nx.DiGraph()
+        self.communities = None
+        self.cursor, self.cursor_ts, self.journal_pos = 0, 0.0, {}
+        self.apply_transactions(df_sample)
         print(f"✅ Graph Built: {self.G.number_of_nodes()} Nodes, {self.G.number_of_edges()} Edges")
 
+    def apply_transactions(self, df):
+        """
+        Folds a batch of transactions into the edge aggregates and advances the cursor.
+        """
+        if self.G is None:
+            self.G = nx.DiGraph()
+        fraud = df['isFraud'] if 'isFraud' in df.columns else pd.Series(0, index=df.index)
+        grouped = (
+            df.assign(isFraud=fraud)
+              .groupby(['nameOrig', 'nameDest'], sort=False)
+              .agg(amount=('amount', 'sum'), count=('amount', 'size'), isFraud=('isFraud', 'sum'))
+        )
+        G = self.G
+        for (src, dst), amount, count, n_fraud in zip(grouped.index, grouped['amount'], grouped['count'], grouped['isFraud']):
+            data = G.get_edge_data(src, dst)
+            if data is None:
+                G.add_edge(src, dst, amount=float(amount), count=int(count), isFraud=int(n_fraud))
+            else:
+                data['amount'] += float(amount)
+                data['count'] += int(count)
+                data['isFraud'] += int(n_fraud)
+
+        # Derived state: MuleRank is recomputed on demand, communities update incrementally
+        self.pagerank = None
+        if self.communities is not None:
+            self.communities.add_edges(zip(df['nameOrig'], df['nameDest'], df['amount'], fraud))
+            self.communities.maybe_refresh()
+
+        self.cursor += len(df)
+        if 'timestamp' in df.columns and len(df):
+            self.cursor_ts = max(self.cursor_ts, float(df['timestamp'].max()))
+        if self.snapshot_dir and self.snapshot_every and self.cursor - self._snapshot_cursor >= self.snapshot_every:
+            self.save_snapshot()
+
+    def _label(self, node):
+        """Account name for display (decodes interned IDs)."""
+        return self.account_ids.name_of(node) if self.account_ids is not None else str(node)
+
     def detect_cycles(self):
         """
         Layer A: Deterministic Cycle Detection (The "Hundi" Loop).
@@ -50,7 +112,7 @@ class GraphIntel:
             if cycles:
                 print(f"🚨 FRAUD DETECTED: Found {len(cycles)} Circular Money Loops!")
                 for i, cycle in enumerate(cycles[:3]):
-                    print(f"   Loop {i+1}: {' -> '.join(cycle)}")
+                    print(f"   Loop {i+1}: {' -> '.join(map(self._label, cycle))}")
             else:
                 print("✅ No suspicious circular loops found in this sample.")
         except Exception as e:
@@ -64,17 +126,189 @@ class GraphIntel:
         if not self.G: self.build_graph()
         
         print("📊 Calculating MuleRank (PageRank)...")
-        pagerank = nx.pagerank(self.G, weight='amount', alpha=0.85)
+        if self.pagerank is None:
+            self.pagerank = nx.pagerank(self.G, weight='amount', alpha=0.85)
         
         # Sort by Score
-        sorted_nodes = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)
+        sorted_nodes = sorted(self.pagerank.items(), key=lambda x: x[1], reverse=True)
         
         print("🚨 TOP 5 SUSPICIOUS 'MULE' ACCOUNTS (High Centrality):")
         for i, (node, score) in enumerate(sorted_nodes[:5]):
-            print(f"   {i+1}. {node} (Score: {score:.6f})")
+            print(f"   {i+1}. {self._label(node)} (Score: {score:.6f})")
+
+    def detect_communities(self):
+        """
+        Layer C: Mule-Ring Community Detection.
+        Union-find components + label propagation, scored by fraud density, hub shape and flow.
+        """
+        if not self.G: self.build_graph()
+
+        if self.communities is None:
+            print("👥 Detecting Mule-Ring Communities (Label Propagation)...")
+            self.communities = CommunityEngine()
+            self.communities.load_state(
+                (src, dst, d['amount'], d['count'], d['isFraud']) for src, dst, d in self.G.edges(data=True)
+            )
+            self.communities.refresh()
+
+        print("🚨 TOP 5 SUSPICIOUS MULE RINGS:")
+        for i, (label, score, size) in enumerate(self.communities.top_communities()):
+            print(f"   {i+1}. Community {self._label(label)} (Members: {size}, Score: {score:.3f})")
+
+    # --- Snapshot / Warm Restore ---
+
+    def save_snapshot(self, directory=None):
+        """
+        Writes the deep-lane state (CSR adjacency, edge aggregates, cursor, MuleRank,
+        community labels) as an atomic, checksummed, memory-mappable snapshot.
+        """
+        if not self.G: self.build_graph()
+        if self.account_ids is not None and not self.account_ids.readonly:
+            # Interned node IDs in the snapshot must be published before the snapshot is
+            self.account_ids.flush()
+        directory = directory or self.snapshot_dir or snapshot.SNAPSHOT_DIR
+        os.makedirs(directory, exist_ok=True)
+        start = time.time()
+
+        nodes = list(self.G.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+        degrees = np.fromiter((self.G.out_degree(node) for node in nodes), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        m = int(indptr[-1])
+        indices = np.empty(m, dtype=np.int64)
+        amount = np.empty(m, dtype=np.float64)
+        count = np.empty(m, dtype=np.uint32)
+        fraud = np.empty(m, dtype=np.uint32)
+        pos = 0
+        for node in nodes:  # G.adj preserves node order, so rows land in CSR order
+            for dst, d in self.G.adj[node].items():
+                indices[pos] = index[dst]
+                amount[pos] = d['amount']
+                count[pos] = d.get('count', 1)
+                fraud[pos] = d.get('isFraud', 0)
+                pos += 1
+
+        sections = {
+            "nodes": np.asarray(nodes, dtype=np.int64) if self.intern_ids else _encode_names(nodes),
+            "indptr": indptr,
+            "indices": indices,
+            "amount": amount,
+            "count": count,
+            "isFraud": fraud,
+        }
+        if self.journal_pos:
+            journals = sorted(self.journal_pos)
+            sections["journal_names"] = _encode_names(journals)
+            sections["journal_seq"] = np.array([self.journal_pos[j][0] for j in journals], dtype=np.int64)
+            sections["journal_offset"] = np.array([self.journal_pos[j][1] for j in journals], dtype=np.int64)
+        if self.pagerank is not None:
+            sections["mulerank"] = np.fromiter((self.pagerank.get(node, 0.0) for node in nodes), dtype=np.float64, count=n)
+        if self.communities is not None:
+            label_of, score_of = self.communities.label_of, self.communities.score_of
+            sections["community"] = np.fromiter((index.get(label_of.get(node), -1) for node in nodes), dtype=np.int64, count=n)
+            sections["community_score"] = np.fromiter(
+                (score_of.get(label_of.get(node), 0.0) for node in nodes), dtype=np.float32, count=n)
+
+        path = snapshot.snapshot_path(directory, self.cursor)
+        snapshot.write_snapshot(path, sections, self.cursor, self.cursor_ts)
+        snapshot.prune(directory)
+        self._snapshot_cursor = self.cursor
+        print(f"📸 Snapshot written: {path} ({n} nodes, {m} edges, {time.time() - start:.2f}s)")
+        return path
+
+    def restore_snapshot(self, directory=None, verify=True):
+        """
+        Warm restart: maps the newest valid snapshot and rebuilds the in-memory state from it.
+        Returns False if no usable snapshot exists (caller should fall back to build_graph()).
+        """
+        directory = directory or self.snapshot_dir or snapshot.SNAPSHOT_DIR
+        found = snapshot.load_latest(directory, verify=verify)
+        if found is None:
+            return False
+        sections, meta, path = found
+        start = time.time()
+
+        raw_nodes = sections["nodes"]
+        nodes = raw_nodes.tolist() if raw_nodes.dtype.kind == 'i' else np.char.decode(raw_nodes, 'utf-8').tolist()
+        indptr = sections["indptr"]
+        src = np.repeat(np.arange(len(nodes)), np.diff(indptr)).tolist()
+        dst = sections["indices"].tolist()
+        amount, count, fraud = sections["amount"].tolist(), sections["count"].tolist(), sections["isFraud"].tolist()
+
+        self.G = nx.DiGraph()
+        self.G.add_nodes_from(nodes)
+        self.G.add_edges_from(
+            (nodes[s], nodes[d], {'amount': a, 'count': c, 'isFraud': f})
+            for s, d, a, c, f in zip(src, dst, amount, count, fraud)
+        )
+        self.pagerank = dict(zip(nodes, sections["mulerank"].tolist())) if "mulerank" in sections else None
+
+        self.communities = None
+        if "community" in sections:
+            labels = sections["community"].tolist()
+            scores = sections["community_score"].tolist()
+            self.communities = CommunityEngine()
+            self.communities.load_state(
+                ((nodes[s], nodes[d], a, c, f) for s, d, a, c, f in zip(src, dst, amount, count, fraud)),
+                labels={node: nodes[label] for node, label in zip(nodes, labels) if label >= 0},
+                scores={nodes[label]: score for label, score in zip(labels, scores) if label >= 0},
+            )
+
+        if self.intern_ids:
+            self.account_ids = AccountIds(readonly=True)
+        self.cursor = self._snapshot_cursor = meta["cursor"]
+        self.cursor_ts = meta["cursor_ts"]
+        self.journal_pos = {}
+        if "journal_names" in sections:
+            self.journal_pos = {
+                name: (seq, offset) for name, seq, offset in zip(
+                    np.char.decode(sections["journal_names"], 'utf-8').tolist(),
+                    sections["journal_seq"].tolist(), sections["journal_offset"].tolist())
+            }
+        print(f"♻️  Restored {path} (cursor {self.cursor}) in {time.time() - start:.2f}s")
+        return True
+
+    def replay_journal(self, journal_dir, batch_size=1 << 16):
+        """
+        Catches up from the Fast Path decision journal(s): applies every record committed after
+        the saved journal position (segment + record offset per journal, so equal or
+        out-of-order timestamps are never skipped). Returns the number of transactions applied.
+        """
+        from data_pipeline.decision_log import DecisionReader
+        if self.G is None:
+            self.G = nx.DiGraph()
+        if self.intern_ids:
+            self.account_ids = AccountIds()  # Writer: replayed accounts may be new
+        applied = 0
+        columns = ["name_orig", "name_dest", "amount", "label", "timestamp"]
+        reader = DecisionReader(journal_dir)
+        for batch in reader.iter_batches(batch_size, columns=columns, since=self.journal_pos):
+            orig = np.char.decode(batch["name_orig"], 'utf-8')
+            dest = np.char.decode(batch["name_dest"], 'utf-8')
+            if self.intern_ids:
+                orig, dest = self.account_ids.encode(orig), self.account_ids.encode(dest)
+            df = pd.DataFrame({
+                'nameOrig': orig,
+                'nameDest': dest,
+                'amount': batch["amount"],
+                'isFraud': np.maximum(batch["label"], 0),
+                'timestamp': batch["timestamp"],
+            })
+            self.journal_pos = dict(reader.position)  # Set first: a periodic snapshot may fire inside
+            self.apply_transactions(df)
+            applied += len(df)
+        if self.intern_ids:
+            self.account_ids.flush()
+        if applied and self.communities is not None:
+            self.communities.refresh()
+        print(f"⏩ Replayed {applied} journal transactions (cursor {self.cursor})")
+        return applied
 
 if __name__ == "__main__":
     intel = GraphIntel()
     intel.build_graph()
     intel.sort_pagerank()
+    intel.detect_communities()
     intel.detect_cycles()
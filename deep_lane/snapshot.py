@@ -0,0 +1,185 @@
+import glob
+import os
+import struct
+import time
+import zlib
+import numpy as np
+
+# --- CONFIGURATION ---
+SNAPSHOT_DIR = "data/snapshots"
+KEEP_SNAPSHOTS = 2
+
+# File layout (all offsets 64-byte aligned, so every section can be np.memmap'ed in place):
+#   header    : magic, layout version, section count, directory crc32, cursor, cursor_ts, created_at
+#   directory : one 64-byte entry per section (name, dtype, offset, length, crc32)
+#   sections  : raw little-endian 1-D arrays
+HEADER_FORMAT = "<8sHHIQdd"
+ENTRY_FORMAT = "<24s12sQQI"
+HEADER_SIZE = 64
+ENTRY_SIZE = 64
+ALIGN = 64
+MAGIC = b"SNTLSNAP"
+LAYOUT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is truncated, corrupt or from an unsupported layout."""
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _crc(array):
+    return zlib.crc32(memoryview(np.ascontiguousarray(array)).cast("B"))
+
+
+def snapshot_path(directory, cursor):
+    return os.path.join(directory, f"snapshot-{cursor:012d}.snap")
+
+
+def write_snapshot(path, sections, cursor, cursor_ts=0.0):
+    """
+    Atomically writes `sections` ({name: 1-D array}) to `path`: the file is built under a
+    temporary name, fsync'ed, then renamed over the target.
+    """
+    names = list(sections)
+    offset = _align(HEADER_SIZE + ENTRY_SIZE * len(names))
+    entries = []
+    for name in names:
+        array = np.ascontiguousarray(sections[name])
+        if array.ndim != 1:
+            raise ValueError(f"Snapshot section {name} must be 1-D")
+        dtype = array.dtype.newbyteorder('<') if array.dtype.byteorder == '>' else array.dtype
+        array = array.astype(dtype, copy=False)
+        entries.append((name, array, offset))
+        offset = _align(offset + array.nbytes)
+
+    directory = b"".join(
+        struct.pack(ENTRY_FORMAT, name.encode(), array.dtype.str.encode(), off, len(array), _crc(array))
+        .ljust(ENTRY_SIZE, b"\0")
+        for name, array, off in entries
+    )
+    header = struct.pack(HEADER_FORMAT, MAGIC, LAYOUT_VERSION, len(names), zlib.crc32(directory),
+                         cursor, cursor_ts, time.time()).ljust(HEADER_SIZE, b"\0")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(directory)
+        for _, array, off in entries:
+            f.seek(off)
+            f.write(memoryview(array).cast("B"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def read_snapshot(path, verify=True):
+    """
+    Maps a snapshot read-only. Returns ({name: memmap}, meta). With `verify`, every section's
+    crc32 is checked (this touches every page once).
+    """
+    size = os.path.getsize(path)
+    if size < HEADER_SIZE:
+        raise SnapshotError(f"{path}: truncated header")
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    magic, version, count, dir_crc, cursor, cursor_ts, created = struct.unpack_from(HEADER_FORMAT, raw, 0)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path}: not a deep-lane snapshot")
+    if version != LAYOUT_VERSION:
+        raise SnapshotError(f"{path}: unsupported layout version {version}")
+    directory = bytes(raw[HEADER_SIZE:HEADER_SIZE + ENTRY_SIZE * count])
+    if zlib.crc32(directory) != dir_crc:
+        raise SnapshotError(f"{path}: directory checksum mismatch")
+
+    sections = {}
+    for i in range(count):
+        name, dtype, offset, length, crc = struct.unpack_from(ENTRY_FORMAT, directory, i * ENTRY_SIZE)
+        name = name.rstrip(b"\0").decode()
+        dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        end = offset + length * dtype.itemsize
+        if end > size:
+            raise SnapshotError(f"{path}: section {name} truncated")
+        array = raw[offset:end].view(dtype)
+        if verify and _crc(array) != crc:
+            raise SnapshotError(f"{path}: section {name} checksum mismatch")
+        sections[name] = array
+    meta = {"version": version, "cursor": cursor, "cursor_ts": cursor_ts, "created": created}
+    return sections, meta
+
+
+def list_snapshots(directory=SNAPSHOT_DIR):
+    """Snapshot paths, newest cursor first."""
+    return sorted(glob.glob(os.path.join(directory, "snapshot-*.snap")), reverse=True)
+
+
+def load_latest(directory=SNAPSHOT_DIR, verify=True):
+    """
+    Maps the newest snapshot that passes validation, falling back to older ones.
+    Returns (sections, meta, path) or None.
+    """
+    for path in list_snapshots(directory):
+        try:
+            sections, meta = read_snapshot(path, verify=verify)
+            return sections, meta, path
+        except (SnapshotError, ValueError, OSError) as e:
+            print(f"⚠️  Skipping snapshot {path}: {e}")
+    return None
+
+
+def prune(directory=SNAPSHOT_DIR, keep=KEEP_SNAPSHOTS):
+    for path in list_snapshots(directory)[keep:]:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    # Restart benchmark: rebuild from CSV (load + graph + MuleRank + communities) vs warm restore
+    import sys
+    import tempfile
+    import pandas as pd
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from deep_lane.graph_analytics import GraphIntel
+
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("data")
+        pd.DataFrame({
+            'step': 1,
+            'type': rng.choice(['TRANSFER', 'CASH_OUT', 'PAYMENT'], size=N),
+            'amount': rng.exponential(5000, size=N).round(2),
+            'nameOrig': np.char.add("C", rng.integers(10**9, 10**9 + N, size=N).astype(str)),
+            'oldbalanceOrg': 0.0, 'newbalanceOrig': 0.0,
+            'nameDest': np.char.add("C", rng.integers(10**9, 10**9 + N // 4, size=N).astype(str)),
+            'oldbalanceDest': 0.0, 'newbalanceDest': 0.0,
+            'isFraud': (rng.random(N) < 0.002).astype(int), 'isFlaggedFraud': 0,
+        }).to_csv("data/paysim.csv", index=False)
+
+        start = time.time()
+        cold = GraphIntel(window=N)
+        cold.build_graph()
+        cold.sort_pagerank()
+        cold.detect_communities()
+        rebuild_s = time.time() - start
+        cold.save_snapshot("snapshots")
+
+        start = time.time()
+        found = load_latest("snapshots")
+        map_s = time.time() - start
+        start = time.time()
+        warm = GraphIntel(window=N)
+        warm.restore_snapshot("snapshots")
+        restore_s = time.time() - start
+
+        size_mb = os.path.getsize(found[2]) / 2**20
+        print(f"🥶 Rebuild from CSV ({N} rows):      {rebuild_s:6.2f}s")
+        print(f"🗺️  Map + verify snapshot ({size_mb:.0f} MB): {map_s:6.2f}s")
+        print(f"♻️  Full warm restore:                 {restore_s:6.2f}s")
+        os.chdir("/")
@@ -1,30 +1,90 @@
 import random
 import time
-import xgboost as xgb
-import pandas as pd
+import numpy as np
 import os
 from .circuit_breaker import CircuitBreaker
 
+# NOTE: xgboost is imported lazily in _load_model(). Importing it takes ~1s (it pulls in
+# sklearn/scipy) and is not needed in mock mode or by modules that only use the helpers here.
+
 MODEL_PATH = "fast_lane/sentinel_xgboost.model"
+RELOAD_CHECK_S = 1.0  # How often process_transaction() stats the model file for a promoted model
+FEATURE_COLS = ['type', 'amount', 'oldbalanceOrg', 'newbalanceOrig', 'errorBalanceOrig', 'errorBalanceDest']
+
+def engineer_features(txn_data):
+    """
+    Builds the model feature tuple (FEATURE_COLS order). Must match training logic!
+    """
+    t_type = 0 if txn_data['type'] == 'TRANSFER' else (1 if txn_data['type'] == 'CASH_OUT' else -1)
+    errorBalanceOrig = txn_data['newbalanceOrig'] + txn_data['amount'] - txn_data['oldbalanceOrg']
+    errorBalanceDest = txn_data['oldbalanceDest'] + txn_data['amount'] - txn_data['newbalanceDest']
+    return (t_type, txn_data['amount'], txn_data['oldbalanceOrg'], txn_data['newbalanceOrig'],
+            errorBalanceOrig, errorBalanceDest)
+
+# (path, mtime) -> Booster. Engines in one process share a single loaded model, and a
+# prefork parent that loads it before forking shares it copy-on-write with its workers.
+_BOOSTER_CACHE = {}
+
+def load_booster(path=MODEL_PATH):
+    key = (path, os.path.getmtime(path))
+    booster = _BOOSTER_CACHE.get(key)
+    if booster is None:
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(path)
+        # Single-row scoring gains nothing from threads, and an idle OpenMP pool
+        # in a prefork parent is not fork-safe.
+        booster.set_param({'nthread': 1})
+        _BOOSTER_CACHE.clear()
+        _BOOSTER_CACHE[key] = booster
+    return booster
 
 class FastPathEngine:
-    def __init__(self):
+    def __init__(self, decision_log=None, model_path=MODEL_PATH):
         self.breaker = CircuitBreaker(timeout_ms=200)
         self.model = None
+        self.model_path = model_path
+        self.model_version = 0  # 0 = mock mode; otherwise the model file's mtime
+        self.decision_log = decision_log  # Optional data_pipeline.decision_log.DecisionLog
+        self.reload_check_s = RELOAD_CHECK_S
+        self._model_mtime = None
+        self._last_reload_check = time.monotonic()
         self._load_model()
 
     def _load_model(self):
         """Loads the trained XGBoost model if available."""
-        if os.path.exists(MODEL_PATH):
+        if os.path.exists(self.model_path):
             try:
-                self.model = xgb.Booster()
-                self.model.load_model(MODEL_PATH)
-                print(f"✅ FastPathEngine: Loaded Real Model from {MODEL_PATH}")
+                mtime = os.path.getmtime(self.model_path)
+                self.model = load_booster(self.model_path)
+                self.model_version = int(mtime)
+                self._model_mtime = mtime
+                print(f"✅ FastPathEngine: Loaded Real Model from {self.model_path}")
             except Exception as e:
                 print(f"❌ FastPathEngine: Failed to load model: {e}")
         else:
             print("⚠️  FastPathEngine: Model not found. Running in MOCK MODE.")
 
+    def maybe_reload(self, force=False):
+        """
+        Picks up a model promoted (atomically replaced) since the last load, e.g. by
+        ml_ops/retrain_incremental.py. Stats the file at most every `reload_check_s` unless
+        `force`. Returns True if a new model was loaded.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_reload_check < self.reload_check_s:
+            return False
+        self._last_reload_check = now
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return False
+        if mtime == self._model_mtime:
+            return False
+        previous = self._model_mtime
+        self._load_model()
+        return self._model_mtime != previous
+
     def _xgboost_predict(self, txn_data):
         """
         Runs Real XGBoost Inference if model exists, else Logic Mock.
@@ -34,32 +94,18 @@ class FastPathEngine:
         # 1. Feature Engineering (Must match training logic!)
         if self.model:
             try:
-                # Type Encoding
-                t_type = 0 if txn_data['type'] == 'TRANSFER' else (1 if txn_data['type'] == 'CASH_OUT' else -1)
+                # Type Encoding + Balance Errors
+                feature_row = engineer_features(txn_data)
                 
                 # Check if it's a relevant type (Transfer/Cashout only)
-                if t_type == -1:
+                if feature_row[0] == -1:
                      # Payment/Debit usually low risk in this specific model context
                     risk_score = 0.01 
                 else:
-                    # Calc Errors
-                    errorBalanceOrig = txn_data['newbalanceOrig'] + txn_data['amount'] - txn_data['oldbalanceOrg']
-                    errorBalanceDest = txn_data['oldbalanceDest'] + txn_data['amount'] - txn_data['newbalanceDest']
-
-                    features = pd.DataFrame([{
-                        'type': t_type,
-                        'amount': txn_data['amount'],
-                        'oldbalanceOrg': txn_data['oldbalanceOrg'],
-                        'newbalanceOrig': txn_data['newbalanceOrig'],
-                        'errorBalanceOrig': errorBalanceOrig,
-                        'errorBalanceDest': errorBalanceDest
-                    }])
+                    features = np.array([feature_row], dtype=np.float64)
                     
-                    # Convert to DMatrix
-                    dtest = xgb.DMatrix(features)
-                    
-                    # Predict
-                    risk_score = float(self.model.predict(dtest)[0])
+                    # Predict (in-place: no DMatrix / DataFrame construction per call)
+                    risk_score = float(self.model.inplace_predict(features)[0])
             except Exception as e:
                 print(f"Prediction Error: {e}")
                 risk_score = 0.5 # Fallback
@@ -78,8 +124,46 @@ class FastPathEngine:
             "latency_ms": latency_ms
         }
 
+    def warm(self):
+        """
+        Runs one throwaway prediction so lazy initialisation inside xgboost happens now
+        (e.g. in a prefork parent) instead of on the first live transaction.
+        """
+        if self.model:
+            self.model.inplace_predict(np.zeros((1, len(FEATURE_COLS)), dtype=np.float64))
+
     def process_transaction(self, txn_data):
         """
         Main entry point for the Fast Path.
         """
-        return self.breaker.execute(txn_data, self._xgboost_predict)
+        self.maybe_reload()
+        result = self.breaker.execute(txn_data, self._xgboost_predict)
+        if self.decision_log is not None and isinstance(result, dict):
+            self._journal(txn_data, result)
+        return result
+
+    def _journal(self, txn_data, result):
+        """
+        Appends the decision to the Decision Journal. Journal failures never block a decision.
+        """
+        try:
+            features = engineer_features(txn_data)
+        except (KeyError, TypeError):
+            # Malformed input still gets an audit record; unknown features are zeroed
+            features = (-1, float(txn_data.get('amount', 0)), 0.0, 0.0, 0.0, 0.0)
+        try:
+            self.decision_log.append(
+                txn_data.get('id', ''),
+                txn_data.get('nameOrig', ''),
+                txn_data.get('nameDest', ''),
+                features,
+                result['risk_score'],
+                result['decision'],
+                breaker=result.get('circuit_breaker_triggered', False),
+                model_version=self.model_version,
+                latency_ms=result.get('latency_ms', 0.0),
+                label=int(txn_data.get('isFraud', -1)),
+                timestamp=txn_data.get('timestamp'),
+            )
+        except Exception as e:
+            print(f"⚠️  FastPathEngine: Decision journal write failed: {e}")
@@ -0,0 +1,221 @@
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from .inference import FastPathEngine, MODEL_PATH
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8700
+
+
+class PreforkServer:
+    """
+    Prefork Scoring Server
+    The parent imports xgboost, loads and warms the model once, then forks workers that share
+    those pages copy-on-write and accept from one listening socket. Protocol: one JSON
+    transaction per line in, one JSON decision per line out.
+    SIGHUP (or reload()) loads a promoted model in the parent and replaces the workers one
+    by one, so they share the new model too; until then each worker reloads it on its own.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, decision_log_dir=None, model_path=MODEL_PATH):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.decision_log_dir = decision_log_dir
+        self.model_path = model_path
+        self.engine = None
+        self.sock = None
+        self.children = {}  # pid -> worker index
+        self._stopping = False
+
+    def start(self):
+        """Binds, loads + warms the model in the parent, then forks the workers."""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+
+        self.engine = FastPathEngine(model_path=self.model_path)
+        self._warm_and_freeze()
+
+        for index in range(self.workers):
+            self._fork(index)
+        print(f"🚀 PreforkServer: {self.workers} workers on {self.host}:{self.port}")
+        return self
+
+    def _warm_and_freeze(self):
+        self.engine.warm()
+        # Move everything allocated so far into the permanent generation: the collector
+        # will not touch (and so not dirty) these pages in the children.
+        gc.collect()
+        gc.freeze()
+
+    def reload(self):
+        """
+        Loads a newly promoted model in the parent, then replaces each worker with a fresh
+        fork. Workers are swapped one at a time (old one reaped before its replacement
+        starts) because each owns a single-writer journal. Returns True if a new model was loaded.
+        """
+        if not self.engine.maybe_reload(force=True):
+            return False
+        self._warm_and_freeze()
+        for pid, index in list(self.children.items()):
+            del self.children[pid]  # Retired: the supervisor must not re-fork it
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self._fork(index)
+        print(f"🔄 PreforkServer: reloaded model (version {self.engine.model_version}), workers replaced")
+        return True
+
+    def _fork(self, index):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                # Exit via SystemExit so the worker's journal tail is committed on the way out
+                signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGHUP, signal.SIG_IGN)
+                self._worker_loop(index)
+            except Exception as e:
+                print(f"❌ PreforkServer worker {index}: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = index
+
+    def _worker_loop(self, index):
+        if self.decision_log_dir:
+            # Journals are single-writer, so each worker gets its own directory
+            from data_pipeline.decision_log import DecisionLog
+            self.engine.decision_log = DecisionLog(os.path.join(self.decision_log_dir, f"worker-{index}"))
+
+        try:
+            while True:
+                conn, _ = self.sock.accept()
+                with conn, conn.makefile("rwb") as stream:
+                    for line in stream:
+                        if not line.strip():
+                            continue
+                        try:
+                            result = self.engine.process_transaction(json.loads(line))
+                        except Exception as e:
+                            result = {"error": str(e)}
+                        stream.write(json.dumps(result).encode() + b"\n")
+                        stream.flush()
+                if self.engine.decision_log is not None:
+                    self.engine.decision_log.commit()
+        finally:
+            if self.engine.decision_log is not None:
+                self.engine.decision_log.close()
+
+    def serve_forever(self):
+        """Supervises the workers, re-forking any that die, until stop() or SIGTERM."""
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        signal.signal(signal.SIGHUP, lambda *_: self.reload())
+        try:
+            while not self._stopping:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                index = self.children.pop(pid, None)
+                if index is not None and not self._stopping:
+                    print(f"⚠️  PreforkServer: worker {index} exited, re-forking")
+                    self._fork(index)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.children.pop(pid, None)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+def score(txn, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Sends one transaction to a PreforkServer and returns its decision."""
+    with socket.create_connection((host, port)) as conn, conn.makefile("rwb") as stream:
+        stream.write(json.dumps(txn).encode() + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def _memory_kb(pid):
+    """Rss / Pss / Private (USS) in KB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def benchmark(workers=4):
+    """
+    Cold start + per-worker memory: N independent interpreters vs one prefork parent.
+    """
+    import subprocess
+    tx = {"id": "BENCH", "amount": 250000.0, "nameOrig": "A", "nameDest": "B", "type": "TRANSFER",
+          "oldbalanceOrg": 300000.0, "newbalanceOrig": 50000.0, "oldbalanceDest": 0.0, "newbalanceDest": 250000.0}
+    ready = "import sys; from fast_lane.inference import FastPathEngine; e = FastPathEngine(); " \
+            f"e.process_transaction({tx!r}); print('READY', flush=True); sys.stdin.read()"
+
+    print(f"🧪 Cold start: {workers} standalone workers")
+    procs, starts = [], []
+    for _ in range(workers):
+        starts.append(time.perf_counter())
+        procs.append(subprocess.Popen([sys.executable, "-c", ready], stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True))
+    for proc, start in zip(procs, starts):
+        while proc.stdout.readline().strip() != "READY":
+            pass
+        rss, pss, uss = _memory_kb(proc.pid)
+        print(f"   pid {proc.pid}: ready {1000 * (time.perf_counter() - start):7.0f}ms | "
+              f"RSS {rss // 1024}MB PSS {pss // 1024}MB USS {uss // 1024}MB")
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+
+    print(f"🧪 Cold start: prefork parent + {workers} workers")
+    start = time.perf_counter()
+    server = PreforkServer(port=0, workers=workers).start()
+    print(f"   parent ready (model loaded + warmed) in {1000 * (time.perf_counter() - start):.0f}ms")
+    try:
+        t0 = time.perf_counter()
+        score(tx, port=server.port)
+        print(f"   first decision {1000 * (time.perf_counter() - t0):.1f}ms")
+        for _ in range(20 * workers):  # Spread connections so every worker has scored
+            score(tx, port=server.port)
+        for pid in server.children:
+            rss, pss, uss = _memory_kb(pid)
+            print(f"   pid {pid}: RSS {rss // 1024}MB PSS {pss // 1024}MB USS {uss // 1024}MB")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    # python -m fast_lane.prefork [workers] | python -m fast_lane.prefork bench [workers]
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    else:
+        PreforkServer(workers=int(sys.argv[1]) if len(sys.argv) > 1 else 4).start().serve_forever()
@@ -0,0 +1,372 @@
+import json
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import average_precision_score
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from data_pipeline.decision_log import DecisionReader, DECISION_LOG_DIR, LABEL_LOG_DIR, RECORD_DTYPE, read_labels
+from ml_ops.train_xgboost import MODEL_OUTPUT_PATH, FEATURE_COLS, MAX_DEPTH, LEARNING_RATE
+
+STATE_PATH = MODEL_OUTPUT_PATH + ".retrain.json"
+DRIFT_PATH = MODEL_OUTPUT_PATH + ".drift.npz"
+
+CONTINUE_ROUNDS = 20
+HOLDOUT_FRACTION = 0.2
+MIN_NEW_LABELS = 1000
+DRIFT_BINS = 20
+PSI_ALERT = 0.2           # Population Stability Index above this = significant drift
+
+
+class StreamingHistogram:
+    """
+    Fixed-edge histogram that can be updated batch by batch in O(n log bins).
+    Edges come from reference quantiles, so each bin starts with ~equal mass.
+    """
+    def __init__(self, edges, counts=None):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None else counts
+
+    @classmethod
+    def from_reference(cls, values, bins=DRIFT_BINS):
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        hist = cls(edges)
+        hist.update(values)
+        return hist
+
+    def update(self, values):
+        idx = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+
+    def psi(self, other, eps=1e-4):
+        """Population Stability Index of `other` against this (reference) histogram."""
+        p = self.counts / max(self.counts.sum(), 1) + eps
+        q = other.counts / max(other.counts.sum(), 1) + eps
+        return float(np.sum((q - p) * np.log(q / p)))
+
+
+class DriftMonitor:
+    """
+    Per-feature drift tracking: a frozen reference histogram vs a streaming current one.
+    """
+    def __init__(self, reference=None):
+        self.reference = reference or {}
+        self.current = {name: StreamingHistogram(h.edges) for name, h in self.reference.items()}
+
+    @classmethod
+    def from_reference(cls, X):
+        return cls({name: StreamingHistogram.from_reference(X[:, i]) for i, name in enumerate(FEATURE_COLS)})
+
+    def update(self, X):
+        for i, name in enumerate(FEATURE_COLS):
+            if name in self.current:
+                self.current[name].update(X[:, i])
+
+    def report(self):
+        return {name: self.reference[name].psi(self.current[name]) for name in self.reference
+                if self.current[name].counts.sum()}
+
+    def save(self, path=DRIFT_PATH):
+        arrays = {}
+        for name, hist in self.reference.items():
+            arrays[f"{name}.edges"] = hist.edges
+            arrays[f"{name}.ref"] = hist.counts
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DRIFT_PATH):
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        return cls({name: StreamingHistogram(data[f"{name}.edges"], data[f"{name}.ref"].copy())
+                    for name in FEATURE_COLS if f"{name}.edges" in data})
+
+
+def _load_state(path=STATE_PATH):
+    # journal_pos: decision journal position (see DecisionReader.position); label_pos: label journal index
+    state = {"journal_pos": {}, "label_pos": 0, "promotions": 0}
+    if os.path.exists(path):
+        with open(path) as f:
+            state.update(json.load(f))
+    return state
+
+
+def _save_state(state, path=STATE_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+JOURNAL_COLUMNS = ["txn_id"] + FEATURE_COLS + ["label", "timestamp"]
+
+
+def _collect(batches):
+    """Stacks filtered journal batches into (X, y, ts, txn_ids)."""
+    if not batches:
+        return np.empty((0, len(FEATURE_COLS))), np.empty(0, dtype=np.int8), np.empty(0), np.empty(0, dtype=RECORD_DTYPE["txn_id"])
+    X = np.column_stack([np.concatenate([b[name] for b in batches]).astype(np.float64) for name in FEATURE_COLS])
+    y = np.concatenate([b["label"] for b in batches])
+    ts = np.concatenate([b["timestamp"] for b in batches])
+    txn_ids = np.concatenate([b["txn_id"] for b in batches])
+    return X, y, ts, txn_ids
+
+
+def read_new_records(journal_dir, since=None):
+    """
+    Features, labels, timestamps and txn IDs of TRANSFER/CASH_OUT decisions journalled after
+    position `since`, plus the position to resume from. Unlabelled records (label -1) are
+    kept for drift tracking.
+    """
+    reader = DecisionReader(journal_dir)
+    batches = []
+    for batch in reader.iter_batches(columns=JOURNAL_COLUMNS, since=since):
+        keep = batch["type"] >= 0  # Model only scores TRANSFER/CASH_OUT
+        if keep.any():
+            batches.append({name: np.asarray(col[keep]) for name, col in batch.items()})
+    return _collect(batches), reader.position
+
+
+def join_late_labels(journal_dir, labels):
+    """
+    Joins label-journal records to their decisions by txn_id, over the whole decision journal
+    (labels may arrive long after the decision). The latest label per transaction wins.
+    Returns (X, y, ts, txn_ids) of the labelled decisions.
+    """
+    if not len(labels):
+        return _collect([])
+    ids, first = np.unique(labels["txn_id"][::-1], return_index=True)
+    latest = labels["label"][::-1][first]
+    batches = []
+    for batch in DecisionReader(journal_dir).iter_batches(columns=JOURNAL_COLUMNS):
+        keep = np.isin(batch["txn_id"], ids) & (batch["type"] >= 0)
+        if keep.any():
+            matched = {name: np.asarray(col[keep]) for name, col in batch.items()}
+            matched["label"] = latest[np.searchsorted(ids, matched["txn_id"])]
+            batches.append(matched)
+    X, y, ts, txn_ids = _collect(batches)
+    # A transaction journalled more than once (e.g. a client retry) is trained on once
+    _, last = np.unique(txn_ids[::-1], return_index=True)
+    keep = np.sort(len(txn_ids) - 1 - last)
+    return X[keep], y[keep], ts[keep], txn_ids[keep]
+
+
+def continue_training(booster, X, y, rounds=CONTINUE_ROUNDS, refresh=False, prune_gamma=None, nthread=2):
+    """
+    Training continuation from an existing booster on new data only.
+    - refresh: first re-fit the leaf values of the existing trees to the new data
+    - prune_gamma: then prune existing splits whose loss reduction is below gamma
+    - rounds: finally append this many new trees
+    Returns a new Booster; `booster` is left untouched.
+    """
+    pos = max(int(y.sum()), 1)
+    params = {
+        'objective': 'binary:logistic',
+        'max_depth': MAX_DEPTH,
+        'eta': LEARNING_RATE,
+        'scale_pos_weight': (len(y) - pos) / pos,
+        'nthread': nthread,
+    }
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURE_COLS)
+    model = booster.copy()
+    existing = model.num_boosted_rounds()
+
+    if refresh and existing:
+        model = xgb.train({**params, 'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True},
+                          dtrain, num_boost_round=existing, xgb_model=model)
+    if prune_gamma is not None and existing:
+        model = xgb.train({**params, 'process_type': 'update', 'updater': 'prune', 'gamma': prune_gamma},
+                          dtrain, num_boost_round=existing, xgb_model=model)
+    if rounds:
+        model = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=model)
+    return model
+
+
+def auprc(booster, X, y):
+    return average_precision_score(y, booster.inplace_predict(X))
+
+
+def promote(booster, model_path=MODEL_OUTPUT_PATH):
+    """
+    Atomically swaps the model file (previous kept as .prev). Running FastPathEngines pick it
+    up via their mtime check; a PreforkServer can be sent SIGHUP to reload it in the parent.
+    """
+    root, ext = os.path.splitext(model_path)
+    tmp = root + ".candidate" + ext  # xgboost picks the format from the extension
+    booster.save_model(tmp)
+    if os.path.exists(model_path):
+        shutil.copy2(model_path, model_path + ".prev")
+    os.replace(tmp, model_path)
+
+
+def incremental_retrain(journal_dir=DECISION_LOG_DIR, model_path=MODEL_OUTPUT_PATH, rounds=CONTINUE_ROUNDS,
+                        refresh=False, prune_gamma=None, holdout_fraction=HOLDOUT_FRACTION,
+                        min_new_labels=MIN_NEW_LABELS, min_gain=0.0, nthread=2,
+                        state_path=STATE_PATH, drift_path=DRIFT_PATH, label_dir=LABEL_LOG_DIR):
+    """
+    One retraining cycle: read decisions journalled and labels received since the last cycle,
+    update drift histograms, continue boosting on the older part of the newly labelled
+    transactions, and promote the candidate only if it beats the current model on the most
+    recent (held-out) part. Newly labelled = labelled at decision time, or labelled later
+    through the label journal (data_pipeline/decision_log.py LabelLog).
+    """
+    start = time.time()
+    state = _load_state(state_path)
+    (X, y, ts, txn_ids), journal_pos = read_new_records(journal_dir, state["journal_pos"])
+    labels, label_pos = read_labels(label_dir, state["label_pos"])
+    X_late, y_late, ts_late, late_ids = join_late_labels(journal_dir, labels)
+    report = {"new_records": len(y), "late_labels": len(y_late), "promoted": False}
+
+    # Only the reference is persisted: the current histogram always covers everything since
+    # the cursor, which is re-read each cycle until enough labels arrive to advance it.
+    monitor = DriftMonitor.load(drift_path)
+    if monitor is None and len(y):
+        monitor = DriftMonitor.from_reference(X)  # First cycle defines the reference
+        monitor.save(drift_path)
+    elif len(y):
+        monitor.update(X)
+        report["psi"] = monitor.report()
+        report["drifted"] = [name for name, psi in report["psi"].items() if psi > PSI_ALERT]
+
+    # Late labels supersede a label recorded at decision time for the same transaction
+    labelled = (y >= 0) & ~np.isin(txn_ids, late_ids)
+    X = np.vstack([X[labelled], X_late])
+    y = np.concatenate([y[labelled], y_late])
+    ts = np.concatenate([ts[labelled], ts_late])
+    report["new_labels"] = len(y)
+    if report["new_labels"] < min_new_labels:
+        print(f"⏸️  Only {report['new_labels']} new labels (< {min_new_labels}); skipping retrain")
+        return report
+
+    # Time-ordered split: train on older labels, evaluate on the most recent window
+    order = np.argsort(ts, kind="stable")
+    X_l, y_l = X[order], y[order].astype(np.int32)
+    split = int(len(y_l) * (1 - holdout_fraction))
+    X_train, y_train, X_hold, y_hold = X_l[:split], y_l[:split], X_l[split:], y_l[split:]
+
+    current = xgb.Booster(model_file=model_path)
+    candidate = continue_training(current, X_train, y_train, rounds, refresh, prune_gamma, nthread)
+    report["retrain_s"] = time.time() - start
+
+    if y_hold.sum() == 0:
+        print("⚠️  Holdout window has no fraud labels; keeping current model")
+        return report
+    report["auprc_current"] = auprc(current, X_hold, y_hold)
+    report["auprc_candidate"] = auprc(candidate, X_hold, y_hold)
+    print(f"📊 Holdout AUPRC: current {report['auprc_current']:.4f} | candidate {report['auprc_candidate']:.4f}")
+
+    if report["auprc_candidate"] >= report["auprc_current"] + min_gain:
+        promote(candidate, model_path)
+        report["promoted"] = True
+        state["promotions"] += 1
+        print(f"🚀 Promoted candidate ({candidate.num_boosted_rounds()} trees) to {model_path}")
+
+    # Only advance the cursors once the labels have been consumed
+    state["journal_pos"] = journal_pos
+    state["label_pos"] = label_pos
+    state["last_run"] = time.time()
+    _save_state(state, state_path)
+    return report
+
+
+def _scheduler_main(interval_s, niceness, max_memory_mb, kwargs):
+    """Background retraining loop with CPU priority and memory limits applied to this process only."""
+    os.nice(niceness)
+    if max_memory_mb:
+        import resource
+        limit = max_memory_mb * 2**20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            report = incremental_retrain(**kwargs)
+            print(f"🔁 Retrain cycle: {report}")
+        except MemoryError:
+            print("❌ Retrain cycle exceeded its memory limit")
+        except Exception as e:
+            print(f"❌ Retrain cycle failed: {e}")
+        time.sleep(interval_s)
+
+
+class RetrainScheduler:
+    """
+    Continuous Retraining
+    Runs incremental_retrain() every `interval_s` in a separate low-priority process with a
+    memory cap and a bounded xgboost thread count, so it never competes with the Fast Path.
+    """
+    def __init__(self, interval_s=3600, niceness=10, max_memory_mb=4096, nthread=2, **kwargs):
+        self.interval_s = interval_s
+        self.niceness = niceness
+        self.max_memory_mb = max_memory_mb
+        self.kwargs = {**kwargs, "nthread": nthread}
+        self.process = None
+
+    def start(self):
+        self.process = mp.Process(
+            target=_scheduler_main,
+            args=(self.interval_s, self.niceness, self.max_memory_mb, self.kwargs),
+            name="sentinel-retrain", daemon=True,
+        )
+        self.process.start()
+        print(f"🗓️  Retrain scheduler started (every {self.interval_s}s, pid {self.process.pid})")
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+
+def _synthetic_period(n, shift, rng):
+    """PaySim-shaped features; fraud empties the origin account, `shift` moves the fraud amount regime."""
+    X = np.zeros((n, len(FEATURE_COLS)))
+    y = (rng.random(n) < 0.01).astype(np.int32)
+    X[:, 0] = rng.integers(0, 2, n)
+    X[:, 1] = rng.exponential(5000, n) * np.where(y == 1, 20 * (1 + shift), 1)
+    X[:, 2] = X[:, 1] + rng.exponential(10000, n)
+    X[:, 3] = np.where((y == 1) & (rng.random(n) < 0.7 - 0.5 * shift), 0.0, X[:, 2] - X[:, 1])
+    X[:, 4] = X[:, 3] + X[:, 1] - X[:, 2] + np.where(y == 1, rng.normal(0, 1000 * (1 + 3 * shift), n), 0)
+    X[:, 5] = rng.normal(0, 100, n) + np.where(y == 1, X[:, 1] * shift, 0)
+    return X, y
+
+
+if __name__ == "__main__":
+    # Benchmark: full retrain vs incremental continuation after a fraud-pattern shift
+    rng = np.random.default_rng(7)
+    X_old, y_old = _synthetic_period(1_000_000, 0.0, rng)
+    X_new, y_new = _synthetic_period(100_000, 1.0, rng)
+    split = int(len(y_new) * (1 - HOLDOUT_FRACTION))
+    X_new_train, y_new_train, X_hold, y_hold = X_new[:split], y_new[:split], X_new[split:], y_new[split:]
+
+    def full_train(X, y, rounds=100):
+        pos = y.sum()
+        params = {'objective': 'binary:logistic', 'max_depth': MAX_DEPTH, 'eta': LEARNING_RATE,
+                  'scale_pos_weight': (len(y) - pos) / pos, 'nthread': 4}
+        return xgb.train(params, xgb.DMatrix(X, label=y, feature_names=FEATURE_COLS), num_boost_round=rounds)
+
+    base = full_train(X_old, y_old)
+    print(f"🧱 Base model on old regime: holdout AUPRC {auprc(base, X_hold, y_hold):.4f}")
+
+    start = time.time()
+    full = full_train(np.vstack([X_old, X_new_train]), np.concatenate([y_old, y_new_train]))
+    full_s = time.time() - start
+    print(f"🐢 Full retrain (100 trees, {len(y_old) + split} rows): {full_s:6.2f}s | AUPRC {auprc(full, X_hold, y_hold):.4f}")
+
+    for refresh in (False, True):
+        start = time.time()
+        inc = continue_training(base, X_new_train, y_new_train, rounds=CONTINUE_ROUNDS, refresh=refresh, nthread=4)
+        inc_s = time.time() - start
+        label = "+ refresh" if refresh else "         "
+        print(f"⚡ Incremental {label} (+{CONTINUE_ROUNDS} trees, {split} rows): {inc_s:6.2f}s | "
+              f"AUPRC {auprc(inc, X_hold, y_hold):.4f} | {full_s / inc_s:.0f}x faster")
+
+    drift = DriftMonitor.from_reference(X_old)
+    drift.update(X_new)
+    print("🌊 Drift (PSI) old -> new:", {k: round(v, 3) for k, v in drift.report().items()})
@@ -2,11 +2,9 @@ import torch
 import torch.nn.functional as F
 from torch_geometric.nn import SAGEConv
 from torch_geometric.data import Data
-import pandas as pd
 import numpy as np
 import sys
 import os
-from sklearn.preprocessing import LabelEncoder
 
 # Add project root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -38,38 +36,35 @@ class FraudSage(torch.nn.Module):
 def train_gnn():
     print("🧠 Starting Sentinel GNN Training (GraphSAGE)...")
     
-    # 1. Load Data
-    df = load_paysim_data()
+    # 1. Load Data (accounts as persistent integer IDs)
+    df = load_paysim_data(intern_ids=True)
     # Sample for demo speed
     df = df.head(100000) 
     
     print("🏗️  Constructing Graph Tensors (PyG Data)...")
     
-    # Encode Nodes
-    le = LabelEncoder()
-    # Fit on all possible accounts
-    all_accounts = pd.concat([df['nameOrig'], df['nameDest']]).unique()
-    le.fit(all_accounts)
+    # Nodes: the sample's persistent account IDs, compacted to 0..n-1. The registry encodes the
+    # whole nameOrig column before nameDest, so sampled IDs are sparse and can be very large;
+    # node_ids maps node index -> account ID so embeddings line up with the graph and feature store.
+    node_ids, local = np.unique(np.concatenate([df['nameOrig'].to_numpy(), df['nameDest'].to_numpy()]),
+                                return_inverse=True)
+    src, dst = local[:len(df)], local[len(df):]
     
-    src = le.transform(df['nameOrig'])
-    dst = le.transform(df['nameDest'])
-    
-    edge_index = torch.tensor([src, dst], dtype=torch.long)
+    edge_index = torch.from_numpy(np.stack([src, dst]).astype(np.int64))
     
     # Features: For demo, we use 'Amount' and 'Type' as node features
     # In reality, you'd aggregate transaction history per node first
     # Here we initialized random embeddings for simplicity of the demo script
-    num_nodes = len(all_accounts)
+    num_nodes = len(node_ids)
     x = torch.randn((num_nodes, 16), dtype=torch.float) # 16-dim embedding
     
     # Labels: We map 'isFraud' from edges back to source nodes
     # (Simplified assumption: If you send fraud, you are fraud)
     y = torch.zeros(num_nodes, dtype=torch.long)
-    fraud_senders = df[df['isFraud'] == 1]['nameOrig']
-    fraud_indices = le.transform(fraud_senders)
-    y[fraud_indices] = 1
+    fraud_indices = src[df['isFraud'].to_numpy() == 1]
+    y[torch.from_numpy(fraud_indices.astype(np.int64))] = 1
     
-    data = Data(x=x, edge_index=edge_index, y=y)
+    data = Data(x=x, edge_index=edge_index, y=y, account_id=torch.from_numpy(node_ids.astype(np.int64)))
     
     # 2. Initialize Model
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -9,8 +9,23 @@ from sklearn.metrics import average_precision_score, confusion_matrix
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from data_pipeline.loader import load_paysim_data
+from fast_lane.inference import FEATURE_COLS
 
 MODEL_OUTPUT_PATH = "fast_lane/sentinel_xgboost.model"
+MAX_DEPTH = 3
+LEARNING_RATE = 0.1
+
+def prepare_features(df):
+    """
+    Type encoding + balance-error features (must match fast_lane/inference.py).
+    """
+    df.loc[df.type == 'TRANSFER', 'type'] = 0
+    df.loc[df.type == 'CASH_OUT', 'type'] = 1
+    df['type'] = df['type'].astype(int)
+    
+    df['errorBalanceOrig'] = df.newbalanceOrig + df.amount - df.oldbalanceOrg
+    df['errorBalanceDest'] = df.oldbalanceDest + df.amount - df.newbalanceDest
+    return df[FEATURE_COLS]
 
 def train_model():
     print("🚀 Starting Sentinel AI Training Pipeline...")
@@ -25,15 +40,7 @@ def train_model():
     # 2. Feature Engineering
     print("🛠  Feature Engineering...")
     
-    df.loc[df.type == 'TRANSFER', 'type'] = 0
-    df.loc[df.type == 'CASH_OUT', 'type'] = 1
-    df['type'] = df['type'].astype(int)
-    
-    df['errorBalanceOrig'] = df.newbalanceOrig + df.amount - df.oldbalanceOrg
-    df['errorBalanceDest'] = df.oldbalanceDest + df.amount - df.newbalanceDest
-
-    feature_cols = ['type', 'amount', 'oldbalanceOrg', 'newbalanceOrig', 'errorBalanceOrig', 'errorBalanceDest']
-    X = df[feature_cols]
+    X = prepare_features(df)
     y = df['isFraud']
 
     # 3. Split
@@ -45,8 +52,8 @@ def train_model():
     weights = (y == 0).sum() / (1.0 * (y == 1).sum())
     clf = xgb.XGBClassifier(
         n_estimators=100,
-        max_depth=3,
-        learning_rate=0.1,
+        max_depth=MAX_DEPTH,
+        learning_rate=LEARNING_RATE,
         scale_pos_weight=weights,
         n_jobs=4,
         random_state=42
@@ -2,6 +2,7 @@ import time
 import random
 import json
 from fast_lane.inference import FastPathEngine
+from data_pipeline.decision_log import DecisionLog
 
 # Mock Data
 NAMES = ["Ramesh", "Sita", "Hari", "Gita", "CryptoKing", "BetMaster", "Mule_1", "Mule_2"]
@@ -48,7 +49,8 @@ def simulate():
     print(">>> STARTING SENTINEL TRAFFIC SIMULATOR (MOCK MODE) <<<")
     print("---------------------------------------------------------")
     
-    engine = FastPathEngine()
+    decision_log = DecisionLog()
+    engine = FastPathEngine(decision_log=decision_log)
     
     try:
         while True:
@@ -97,6 +99,8 @@ def simulate():
             
     except KeyboardInterrupt:
         print("\nStopping Simulator...")
+    finally:
+        decision_log.close()
 
 if __name__ == "__main__":
     simulate()
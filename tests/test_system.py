@@ -2,14 +2,24 @@ import sys
 import os
 import pytest
 import time
-import torch
+import subprocess
+import numpy as np
+import pandas as pd
+import xgboost as xgb
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from fast_lane.inference import FastPathEngine
 from fast_lane.circuit_breaker import CircuitBreaker
+from fast_lane.prefork import PreforkServer, score
 import deep_lane.graph_analytics as ga
+from data_pipeline.decision_log import DecisionLog, DecisionReader, LabelLog
+from data_pipeline.account_ids import AccountIds
+from deep_lane.sharded_graph import ShardedGraph
+from deep_lane.community import CommunityEngine
+from deep_lane import snapshot
+from ml_ops import retrain_incremental as ri
 
 # --- FAST PATH TESTS ---
 
@@ -56,6 +66,80 @@ def test_circuit_breaker_stability():
     assert res == "SUCCESS"
     print("\n✅ Circuit Breaker Stability Verified")
 
+# Cumulative import budget for the scoring entry point (python -X importtime, microseconds)
+IMPORT_BUDGET_US = 500_000
+
+def test_inference_import_budget():
+    """Verify importing the Fast Path stays lazy: no xgboost/pandas, within the startup budget."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import fast_lane.inference"],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative)
+
+    for heavy in ("xgboost", "pandas", "sklearn", "torch"):
+        assert heavy not in modules, f"❌ {heavy} imported eagerly by fast_lane.inference"
+    assert modules["fast_lane.inference"] < IMPORT_BUDGET_US, \
+        f"❌ Import took {modules['fast_lane.inference'] / 1000:.0f}ms"
+    print(f"\n✅ Fast Path Import: {modules['fast_lane.inference'] / 1000:.0f}ms")
+
+def test_prefork_server_scores(tmp_path):
+    """Verify prefork workers answer transactions over the socket and their journals are replayable."""
+    server = PreforkServer(port=0, workers=2, decision_log_dir=str(tmp_path)).start()
+    try:
+        for i in range(4):
+            result = score({
+                "id": f"TEST-TXN-{i}", "amount": 100.0, "nameOrig": "A", "nameDest": "B", "type": "PAYMENT",
+                "oldbalanceOrg": 100.0, "newbalanceOrig": 0.0, "oldbalanceDest": 0.0, "newbalanceDest": 100.0
+            }, port=server.port)
+    finally:
+        server.stop()
+    assert result["decision"] in ["ALLOW", "BLOCK"]
+    journalled = DecisionReader(str(tmp_path)).read_all(["txn_id"])["txn_id"]
+    assert sorted(journalled) == [f"TEST-TXN-{i}".encode() for i in range(4)]
+    print(f"\n✅ Prefork Server Verified: {result}")
+
+def test_promoted_model_reload(tmp_path):
+    """Verify a promoted model reaches a running engine and prefork workers, and is journalled as a new version."""
+    X, y = ri._synthetic_period(5000, 0.0, np.random.default_rng(1))
+    dtrain = xgb.DMatrix(X, label=y, feature_names=ri.FEATURE_COLS)
+    model_path = str(tmp_path / "model.json")
+    xgb.train({'objective': 'binary:logistic', 'max_depth': 2}, dtrain, num_boost_round=2).save_model(model_path)
+    os.utime(model_path, (1_700_000_000, 1_700_000_000))
+    txn = {"id": "TX-RELOAD", "amount": 250000.0, "nameOrig": "A", "nameDest": "B", "type": "TRANSFER",
+           "oldbalanceOrg": 250000.0, "newbalanceOrig": 0.0, "oldbalanceDest": 0.0, "newbalanceDest": 0.0}
+
+    def promote_new_model(version):
+        ri.promote(xgb.train({'objective': 'binary:logistic', 'max_depth': 3}, dtrain, num_boost_round=4), model_path)
+        os.utime(model_path, (version, version))
+
+    engine = FastPathEngine(model_path=model_path)
+    engine.reload_check_s = 0.0
+    old_model = engine.model
+    engine.process_transaction(txn)
+    promote_new_model(1_700_000_100)
+    engine.process_transaction(txn)
+    assert engine.model is not old_model and engine.model_version == 1_700_000_100
+
+    server = PreforkServer(port=0, workers=2, decision_log_dir=str(tmp_path / "journal"), model_path=model_path).start()
+    try:
+        score(txn, port=server.port)
+        old_workers = set(server.children)
+        promote_new_model(1_700_000_200)
+        assert server.reload()
+        assert server.engine.model_version == 1_700_000_200
+        assert not old_workers & set(server.children) and len(server.children) == 2
+        score(txn, port=server.port)
+    finally:
+        server.stop()
+    versions = DecisionReader(str(tmp_path / "journal")).read_all(["model_version"])["model_version"]
+    assert sorted(versions) == [1_700_000_100, 1_700_000_200]
+
 # --- DEEP PATH TESTS ---
 
 def test_gnn_model_artifact():
@@ -73,5 +157,283 @@ def test_graph_analytics_import():
     except Exception as e:
         pytest.fail(f"Graph Analytics Import Failed: {e}")
 
+def test_sharded_graph_queries():
+    """Verify cross-shard loop detection, tracing and rebalancing on the sharded deep lane."""
+    graph = ShardedGraph(num_workers=3)
+    try:
+        # Hundi loop A -> B -> C -> A plus a ping-pong D <-> E
+        graph.ingest([("A", "B", 100.0), ("B", "C", 90.0), ("C", "A", 80.0),
+                      ("C", "X", 5.0), ("D", "E", 1.0), ("E", "D", 1.0)])
+        assert graph.detect_loop("A")
+        assert not graph.detect_loop("D")
+        assert graph.trace_downstream("A") == {"B": 1, "C": 2, "X": 3}
+
+        graph.resize(2)
+        assert graph.detect_loop("B")
+        # A shortcut A -> C closes a 2-hop return path; the 3-hop loop must still be found
+        graph.ingest([("A", "C", 10.0)])
+        assert graph.detect_loop("A")
+        graph.resize(4)
+        assert graph.fan_in("A") == 1
+        assert sum(s["edges"] for s in graph.barrier().values()) == 7
+    finally:
+        graph.close()
+    print("\n✅ Sharded Deep Lane Verified")
+
+def test_sharded_graph_communities():
+    """Verify the community worker refreshes on its edge cadence and feeds ring risk into scoring."""
+    graph = ShardedGraph(num_workers=2, communities=True, community_refresh_every=8)
+    try:
+        graph.ingest([(f"SMURF_{i}", "MULE", 9000.0) for i in range(6)])
+        assert graph.community_risk("SMURF_3") == 0.0  # Below the cadence: no pass yet
+        graph.ingest([("MULE", "CASHOUT_1", 20000.0), ("MULE", "SMURF_0", 8000.0)])
+        assert graph.community_risk("SMURF_3") > 0.0
+        assert graph.top_communities(1)[0][2] == 8
+        assert graph.process_transaction("TX-1", "SMURF_3") == "OK"
+        assert graph.get_risk("SMURF_3") == pytest.approx(0.4 * graph.community_risk("SMURF_3"))
+    finally:
+        graph.close()
+
+def test_community_detection_incremental():
+    """Verify a streamed mule ring is surfaced and scored above an ordinary merchant star."""
+    engine = CommunityEngine()
+    engine.add_edges([(f"SMURF_{i}", "MULE", 9000.0, 1) for i in range(6)])
+    engine.add_edges([(f"CUST_{i}", "MERCHANT", 50.0, 0) for i in range(6)])
+    engine.refresh()
+    engine.add_edges([("MULE", "CASHOUT_1", 20000.0, 1), ("MULE", "SMURF_0", 8000.0, 1)])
+    engine.refresh()
+
+    assert engine.community_of("SMURF_3") == engine.community_of("CASHOUT_1")
+    assert engine.component_size("MULE") == 8
+    assert engine.risk("SMURF_3") > 0.8
+    assert engine.risk("CUST_1") < engine.risk("SMURF_3")
+    assert engine.risk("UNKNOWN") == 0.0
+    print("\n✅ Community Detection Verified")
+
+def test_snapshot_warm_restore(tmp_path):
+    """Verify a deep-lane snapshot restores graph, MuleRank and communities, then replays only newer journal records."""
+    intel = ga.GraphIntel(snapshot_dir=str(tmp_path / "snapshots"))
+    intel.apply_transactions(pd.DataFrame({
+        "nameOrig": ["A", "B", "C", "A", "S1", "S2", "S3"],
+        "nameDest": ["B", "C", "A", "B", "HUB", "HUB", "HUB"],
+        "amount": [100.0, 90.0, 80.0, 50.0, 9000.0, 9000.0, 9000.0],
+        "isFraud": [0, 0, 0, 0, 1, 1, 1],
+        "timestamp": [100.0] * 7,
+    }))
+    intel.sort_pagerank()
+    intel.detect_communities()
+    intel.save_snapshot()
+
+    warm = ga.GraphIntel(snapshot_dir=str(tmp_path / "snapshots"))
+    assert warm.restore_snapshot()
+    assert warm.cursor == 7 and warm.cursor_ts == 100.0
+    assert warm.G.edges["A", "B"] == {"amount": 150.0, "count": 2, "isFraud": 0}
+    assert warm.pagerank == pytest.approx(intel.pagerank)
+    assert warm.communities.risk("S1") == pytest.approx(intel.communities.risk("S1"))
+
+    # Names longer than 16 bytes (and non-ASCII ones) round-trip without being merged
+    long_names = ga.GraphIntel(snapshot_dir=str(tmp_path / "long"))
+    long_names.apply_transactions(pd.DataFrame({
+        "nameOrig": ["MERCHANT_ACCOUNT_0001", "MERCHANT_ACCOUNT_0002"], "nameDest": ["Kathmandu_ब", "B"],
+        "amount": [1.0, 2.0],
+    }))
+    long_names.save_snapshot()
+    restored = ga.GraphIntel(snapshot_dir=str(tmp_path / "long"))
+    assert restored.restore_snapshot()
+    assert set(restored.G.nodes) == {"MERCHANT_ACCOUNT_0001", "MERCHANT_ACCOUNT_0002", "Kathmandu_ब", "B"}
+
+    journal = str(tmp_path / "journal")
+    features = (0, 1.0, 0.0, 0.0, 0.0, 0.0)
+    log = DecisionLog(journal, segment_records=2)
+    log.append("TX-1", "C", "D", features, 0.1, "ALLOW", timestamp=200.0)
+    log.commit()
+    assert warm.replay_journal(journal) == 1
+    warm.save_snapshot()
+
+    # Replay resumes from the journal position: equal and out-of-order timestamps, records in a
+    # rotated segment and a prefork worker journal are all applied exactly once
+    log.append("TX-2", "C", "E", features, 0.1, "ALLOW", timestamp=200.0)
+    log.append("TX-3", "C", "F", features, 0.1, "ALLOW", timestamp=50.0)
+    log.close()
+    worker = DecisionLog(os.path.join(journal, "worker-0"))
+    worker.append("TX-4", "C", "G", features, 0.1, "ALLOW", timestamp=10.0)
+    worker.close()
+    resumed = ga.GraphIntel(snapshot_dir=str(tmp_path / "snapshots"))
+    assert resumed.restore_snapshot()
+    assert resumed.replay_journal(journal) == 3
+    assert resumed.G.edges["C", "D"]["count"] == 1
+    assert all(resumed.G.has_edge("C", dst) for dst in "EFG")
+    assert resumed.cursor == 11
+    assert resumed.replay_journal(journal) == 0
+
+    # A corrupt newest snapshot falls back to the previous one
+    newest = resumed.save_snapshot()
+    with open(newest, "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b"\xff" * 8)
+    sections, meta, path = snapshot.load_latest(str(tmp_path / "snapshots"))
+    assert path != newest and meta["cursor"] == 8
+    print("\n✅ Snapshot Warm Restore Verified")
+
+def test_snapshot_publishes_interned_ids(tmp_path, monkeypatch):
+    """Verify a periodic snapshot of an interned graph never references unpublished account IDs."""
+    monkeypatch.chdir(tmp_path)
+    intel = ga.GraphIntel(intern_ids=True, snapshot_dir="snapshots", snapshot_every=1)
+    intel.account_ids = AccountIds()  # Writer, as in replay_journal (which flushes only at the end)
+    ids = intel.account_ids.encode(["A", "B"])
+    intel.apply_transactions(pd.DataFrame({"nameOrig": [ids[0]], "nameDest": [ids[1]], "amount": [1.0]}))
+    assert snapshot.list_snapshots("snapshots")
+    assert len(AccountIds(readonly=True)) == 2
+
+# --- DECISION LOG TESTS ---
+
+def test_decision_log_replay(tmp_path):
+    """Verify journalled decisions survive rotation and compaction and replay in order."""
+    log = DecisionLog(str(tmp_path), segment_records=4, group_commit=2)
+    for i in range(10):
+        log.append(f"TX-{i}", "C_ORIG", "C_DEST", (0, float(i), 10.0, 0.0, 0.0, 0.0), 0.9, "BLOCK")
+    log.close()
+    assert DecisionLog(str(tmp_path)).compact() == 2
+
+    data = DecisionReader(str(tmp_path)).read_all()
+    assert list(data["amount"]) == [float(i) for i in range(10)]
+    assert data["txn_id"][9] == b"TX-9"
+    assert (data["decision"] == 1).all()
+    print("\n✅ Decision Log Replay Verified")
+
+def test_decision_log_uncommitted_tail(tmp_path):
+    """Verify records past the last group commit are not visible to readers."""
+    log = DecisionLog(str(tmp_path), group_commit=4, commit_interval_ms=60000)
+    for i in range(6):
+        log.append(f"TX-{i}", "C_ORIG", "C_DEST", (1, 1.0, 0.0, 0.0, 0.0, 0.0), 0.1, "ALLOW")
+    assert len(DecisionReader(str(tmp_path)).read_all()["txn_id"]) == 4
+    log.close()
+    assert len(DecisionReader(str(tmp_path)).read_all()["txn_id"]) == 6
+
+def test_decision_log_commit_interval(tmp_path):
+    """Verify an idle journal still commits within commit_interval_ms."""
+    log = DecisionLog(str(tmp_path), group_commit=1000, commit_interval_ms=50)
+    for i in range(3):
+        log.append(f"TX-{i}", "C_ORIG", "C_DEST", (1, 1.0, 0.0, 0.0, 0.0, 0.0), 0.1, "ALLOW")
+    time.sleep(0.3)
+    assert len(DecisionReader(str(tmp_path)).read_all()["txn_id"]) == 3
+    log.close()
+
+def test_decision_log_wide_fields(tmp_path):
+    """Verify UUID txn IDs, long and non-ASCII names round-trip, and over-long values are rejected."""
+    txn_id = "TXN-3f1c2a9e-8d4b-4c6e-9a7f-2b1d0e5c4a3b"
+    log = DecisionLog(str(tmp_path))
+    log.append(txn_id, "MERCHANT_ACCOUNT_0001", "पसल_01", (0, 1.0, 0.0, 0.0, 0.0, 0.0), 0.1, "ALLOW")
+    log.append("TX-2", "MERCHANT_ACCOUNT_0002", "B", (0, 1.0, 0.0, 0.0, 0.0, 0.0), 0.1, "ALLOW")
+    with pytest.raises(ValueError):
+        log.append("TX-3", "A" * 25, "B", (0, 1.0, 0.0, 0.0, 0.0, 0.0), 0.1, "ALLOW")
+    log.close()
+
+    frame = DecisionReader(str(tmp_path)).to_frame()
+    assert list(frame["txn_id"]) == [txn_id, "TX-2"]
+    assert list(frame["name_orig"]) == ["MERCHANT_ACCOUNT_0001", "MERCHANT_ACCOUNT_0002"]
+    assert frame["name_dest"][0] == "पसल_01"
+
+# --- ACCOUNT ID TESTS ---
+
+def test_account_ids_persistent(tmp_path):
+    """Verify interned IDs are dense, stable across reopen, and visible to read-only mappers."""
+    registry = AccountIds(str(tmp_path))
+    ids = registry.encode(["C1231006815", "M1979787155", "C1231006815"])
+    assert list(ids) == [0, 1, 0]
+
+    # Grow past the initial table sizes
+    names = [f"C{i:010d}" for i in range(100000)]
+    bulk = registry.encode(names)
+    assert list(bulk[:3]) == [2, 3, 4] and len(registry) == 100002
+    registry.flush()
+
+    reader = AccountIds(str(tmp_path), readonly=True)
+    assert (reader.encode(names, add=False) == bulk).all()
+    assert reader.name_of(1) == "M1979787155"
+    assert reader.id_of("C_UNKNOWN") is None
+
+    registry.encode(["C_NEW_ACCOUNT"])
+    registry.flush()
+    reader.refresh()
+    assert reader.id_of("C_NEW_ACCOUNT") == 100002
+    assert list(AccountIds(str(tmp_path)).decode([0, 100002])) == ["C1231006815", "C_NEW_ACCOUNT"]
+
+    # Growth across several unflushed encode() calls keeps every issued ID
+    growing = AccountIds(str(tmp_path / "growing"))
+    batches = [[f"C{i}" for i in range(start, end)] for start, end in ((0, 150000), (150000, 160000), (160000, 270000))]
+    issued = [growing.encode(batch) for batch in batches]
+    assert len(growing) == 270000
+    assert growing.id_of("C109999") == 109999
+    assert growing.encode(["NEW"])[0] == 270000
+    assert all((growing.encode(batch, add=False) == ids).all() for batch, ids in zip(batches, issued))
+
+    # Over-long names are rejected rather than truncated into another account's ID
+    for too_long in (["C1C1C1C1C1C1C1C1C1C1"], np.array([b"C1C1C1C1C1C1C1C1C1C1"])):
+        with pytest.raises(ValueError):
+            registry.encode(too_long)
+    print("\n✅ Account ID Interning Verified")
+
+# --- CONTINUOUS RETRAINING TESTS ---
+
+def test_incremental_retrain_from_journal(tmp_path):
+    """Verify a retrain cycle continues boosting from journalled labels, promotes, and advances its cursor."""
+    rng = np.random.default_rng(0)
+    X_old, y_old = ri._synthetic_period(20000, 0.0, rng)
+    base = xgb.train({'objective': 'binary:logistic', 'max_depth': ri.MAX_DEPTH},
+                     xgb.DMatrix(X_old, label=y_old, feature_names=ri.FEATURE_COLS), num_boost_round=10)
+    model_path = str(tmp_path / "model.json")
+    base.save_model(model_path)
+
+    def journal_period(first_id, n, labelled=True):
+        X_new, y_new = ri._synthetic_period(n, 1.0, rng)
+        log = DecisionLog(str(tmp_path / "journal"))
+        for i, (row, label) in enumerate(zip(X_new, y_new), start=first_id):
+            log.append(f"TX-{i}", "C_ORIG", "C_DEST", tuple(row), 0.5, "ALLOW",
+                       label=int(label) if labelled else -1, timestamp=1000.0 + i)
+        log.close()
+        return y_new
+
+    journal_period(0, 5000)
+
+    kwargs = dict(journal_dir=str(tmp_path / "journal"), model_path=model_path, rounds=5, min_new_labels=100,
+                  min_gain=-1.0, state_path=str(tmp_path / "state.json"), drift_path=str(tmp_path / "drift.npz"),
+                  label_dir=str(tmp_path / "labels"))
+    report = ri.incremental_retrain(**kwargs)
+    assert report["new_labels"] == 5000 and report["promoted"]
+    assert xgb.Booster(model_file=model_path).num_boosted_rounds() == 15
+    assert os.path.exists(model_path + ".prev")
+
+    # Cursor advanced: nothing new to train on, drift reference persisted
+    report = ri.incremental_retrain(**kwargs)
+    assert report["new_records"] == 0 and not report["promoted"]
+    assert ri.DriftMonitor.load(str(tmp_path / "drift.npz")) is not None
+
+    # A later cycle with new records measures drift against the persisted reference and retrains again
+    journal_period(5000, 3000)
+    report = ri.incremental_retrain(**kwargs)
+    assert report["new_labels"] == 3000 and report["promoted"]
+    assert set(report["psi"]) == set(ri.FEATURE_COLS) and max(report["psi"].values()) < ri.PSI_ALERT
+    assert xgb.Booster(model_file=model_path).num_boosted_rounds() == 20
+
+    # Labels that arrive after the decision (chargebacks) are joined back by txn_id
+    y_late = journal_period(8000, 2000, labelled=False)
+    report = ri.incremental_retrain(**kwargs)
+    assert report["new_labels"] == 0 and not report["promoted"]
+    labels = LabelLog(str(tmp_path / "labels"))
+    labels.extend([f"TX-{i}" for i in range(8000, 10000)], y_late)
+    labels.close()
+    report = ri.incremental_retrain(**kwargs)
+    assert report["late_labels"] == 2000 and report["new_labels"] == 2000 and report["promoted"]
+    assert xgb.Booster(model_file=model_path).num_boosted_rounds() == 25
+    assert ri.incremental_retrain(**kwargs)["new_labels"] == 0
+
+    reference = ri.StreamingHistogram.from_reference(rng.normal(0, 1, 10000))
+    same, shifted = ri.StreamingHistogram(reference.edges), ri.StreamingHistogram(reference.edges)
+    same.update(rng.normal(0, 1, 10000))
+    shifted.update(rng.normal(1, 1, 10000))
+    assert reference.psi(same) < 0.05 < ri.PSI_ALERT < reference.psi(shifted)
+    print("\n✅ Incremental Retraining Verified")
+
 if __name__ == "__main__":
     sys.exit(pytest.main(["-v", __file__]))